@@ -44,8 +44,14 @@ def client():
     return client
 
 
+@pytest.fixture(scope="session")
+def contract_code():
+    return CONTRACT_PATH.read_text()
+
+
 @pytest.fixture
-def contract(client):
-    code = CONTRACT_PATH.read_text()
-    client.submit(code, name="con_privacy_token", owner=None)
+def contract(client, contract_code):
+    # Deployed fresh per test: contract state lives in the client's storage driver,
+    # so a copied contract object would still share (and clobber) that state.
+    client.submit(contract_code, name="con_privacy_token", owner=None)
     return client.get_contract("con_privacy_token")
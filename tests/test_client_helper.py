@@ -2,8 +2,8 @@ import pytest
 
 
 def test_create_commitment_is_deterministic(helper_module):
-    c1 = helper_module.create_commitment(5.5, 123)
-    c2 = helper_module.create_commitment(5.5, 123)
+    c1 = helper_module.uncached_create_commitment(5.5, 123)
+    c2 = helper_module.uncached_create_commitment(5.5, 123)
     assert c1 == c2
 
 
@@ -109,6 +109,14 @@ def test_random_blinding_within_modulus(helper_module):
     assert all(0 <= value < helper_module.p for value in values)
 
 
+def test_random_blinding_batch_within_modulus(helper_module):
+    # Spans several refills of the entropy buffer
+    values = helper_module.random_blinding_batch(300)
+    assert len(values) == 300
+    assert len(set(values)) == 300
+    assert all(0 <= value < helper_module.p - 1 for value in values)
+
+
 def test_commitment_account_round_trip(helper_module):
     incoming = helper_module.create_commitment(5, 1111)
     outgoing = helper_module.create_commitment(2, 2222)
@@ -121,3 +129,243 @@ def test_commitment_account_round_trip(helper_module):
     account.apply_outgoing(outgoing)
     expected = (after_in * helper_module.mod_inverse(outgoing)) % helper_module.p
     assert account.commitment == expected
+
+
+def test_batch_mod_inverse_matches_scalar(helper_module):
+    xs = [helper_module.create_commitment(i, 100 + i) for i in range(5)]
+    invs = helper_module.batch_mod_inverse(xs)
+    assert invs == [helper_module.mod_inverse(x) for x in xs]
+    assert helper_module.batch_mod_inverse([]) == []
+    with pytest.raises(ValueError):
+        helper_module.batch_mod_inverse([3, 0])
+
+
+def test_build_confidential_transfer_batch_chains_sender(helper_module):
+    sender = helper_module.create_commitment(20, 42)
+    receivers = [helper_module.ZERO_COMMITMENT, helper_module.create_commitment(1, 9)]
+    plans = helper_module.build_confidential_transfer_batch(
+        sender_commitment=sender,
+        receiver_commitments=receivers,
+        amounts=[3, 4.5],
+        amount_blindings=[11, 22],
+        next_nonce=2,
+    )
+
+    first = helper_module.build_confidential_transfer(sender, receivers[0], 3, 11, 2)
+    second = helper_module.build_confidential_transfer(
+        first["new_sender_commitment"], receivers[1], 4.5, 22, 3
+    )
+    assert plans == [first, second]
+
+
+def test_build_confidential_transfer_batch_rejects_length_mismatch(helper_module):
+    with pytest.raises(ValueError):
+        helper_module.build_confidential_transfer_batch(1, [None] * 3, [1, 2, 3], [11])
+    with pytest.raises(ValueError):
+        helper_module.build_confidential_transfer_batch(1, [None], [1, 2])
+
+
+def test_mod_exp_matches_builtin_pow(helper_module):
+    p = helper_module.p
+    cases = [(helper_module.g, 0), (helper_module.h, 1), (p - 1, 2), (12345, p - 2), (p + 7, 2**256 - 1)]
+    for base, exponent in cases:
+        assert helper_module.mod_exp(base, exponent, p) == pow(base, exponent, p)
+    assert helper_module.mod_exp(3, 5, 7) == pow(3, 5, 7)
+    assert helper_module.mod_exp(3, -2, 7) == 1
+
+
+def test_fixed_base_exp_matches_mod_exp(helper_module):
+    p = helper_module.p
+    for exponent in (0, 1, 15, 16, 2**127 + 5, 2**128 - 1):
+        assert helper_module.fixed_base_exp(helper_module.G_TABLE, exponent) == pow(helper_module.g, exponent, p)
+    for exponent in (0, 1, 15, 16, 2**128 + 3, p - 2, 2**256 - 1):
+        assert helper_module.fixed_base_exp(helper_module.H_TABLE, exponent) == pow(helper_module.h, exponent, p)
+
+
+def test_value_exponents_fit_g_table(helper_module):
+    assert len(helper_module.G_TABLE) * helper_module.WINDOW_BITS == helper_module.VALUE_EXPONENT_BITS
+    for value in (0, 1, 5.5, "10.5", 2**200):
+        assert helper_module.value_to_exponent(value) < 2**helper_module.VALUE_EXPONENT_BITS
+
+
+def test_value_to_exponent_cache_keys_on_text(helper_module):
+    assert helper_module.value_to_exponent(5) == helper_module.value_to_exponent("5")
+    assert helper_module.value_to_exponent(5) != helper_module.value_to_exponent(5.0)
+    assert helper_module.value_to_exponent(float("nan")) == helper_module.value_to_exponent(float("nan"))
+    assert helper_module.generators() == (helper_module.g, helper_module.h)
+
+
+def test_div_mod_p_matches_inverse_product(helper_module):
+    p = helper_module.p
+    den = helper_module.create_commitment(4, 77)
+    for num in (0, 1, 5, p - 1, p + 9, helper_module.g):
+        assert helper_module.div_mod_p(num, den) == (num * helper_module.mod_inverse(den)) % p
+    with pytest.raises(ValueError):
+        helper_module.div_mod_p(7, p)
+    with pytest.raises(ValueError):
+        helper_module.CommitmentAccount(5).apply_outgoing(p)
+
+
+def test_commitment_account_outgoing_batch(helper_module):
+    start = helper_module.create_commitment(10, 31)
+    outgoing = [helper_module.create_commitment(i, 40 + i) for i in range(1, 4)]
+
+    sequential = helper_module.CommitmentAccount(start)
+    for commitment in outgoing:
+        sequential.apply_outgoing(commitment)
+
+    batched = helper_module.CommitmentAccount(start)
+    assert batched.apply_outgoing_batch(outgoing) == sequential.commitment
+
+    precomputed = helper_module.CommitmentAccount(start)
+    for commitment, inv in zip(outgoing, helper_module.batch_mod_inverse(outgoing)):
+        precomputed.apply_outgoing(commitment, inv_amount_commitment=inv)
+    assert precomputed.commitment == sequential.commitment
+
+    invs = helper_module.batch_mod_inverse(outgoing)
+    with pytest.raises(ValueError):
+        precomputed.apply_outgoing(outgoing[0], inv_amount_commitment=invs[1])
+    assert precomputed.commitment == sequential.commitment
+
+
+def test_prefixed_digest_matches_hex(helper_module):
+    for seeded, prefix, text in (
+        (helper_module._VAL_HASHER, "VAL|", "5.5"),
+        (helper_module._VAL_HASHER, "VAL|", "0"),
+        (helper_module._GEN_HASHER, "XCTOK:gen:", "g"),
+    ):
+        digest = helper_module._prefixed_digest(seeded, text)
+        assert digest[:16] == bytes.fromhex(helper_module.sha3_hex(prefix + text)[:32])
+
+
+def test_create_commitment_blinding_is_taken_mod_group_order(helper_module):
+    p = helper_module.p
+    for blinding in (p - 1, p, 2**255 + 1, 2**256 - 1, 2**256 + 5, -3):
+        assert helper_module.create_commitment(3, blinding) == helper_module.create_commitment(3, blinding % (p - 1))
+
+
+def test_mod_exp_mpz_matches_mod_exp(helper_module):
+    p = helper_module.p
+    for base, exponent in ((helper_module.g, 12345), (7, p - 2), (5, 0)):
+        assert int(helper_module.mod_exp_mpz(base, exponent, p)) == helper_module.mod_exp(base, exponent, p)
+
+
+def test_commitment_account_rejects_unreduced_commitment(helper_module):
+    assert helper_module.CommitmentAccount(0).commitment == helper_module.ZERO_COMMITMENT
+    with pytest.raises(ValueError):
+        helper_module.CommitmentAccount(helper_module.p)
+    with pytest.raises(ValueError):
+        helper_module.CommitmentAccount(-5)
+
+    account = helper_module.CommitmentAccount(5)
+    for apply, bad in ((account.apply_incoming, 0), (account.apply_incoming, helper_module.p),
+                       (account.apply_outgoing, helper_module.p),
+                       (account.apply_outgoing_batch, [3, helper_module.p])):
+        with pytest.raises(ValueError):
+            apply(bad)
+    with pytest.raises(ValueError):
+        account.apply_outgoing(3, inv_amount_commitment=0)
+    assert account.commitment == 5
+
+
+def test_create_commitment_cache_matches_uncached(helper_module):
+    for value, blinding in ((5.5, 123), ("5.5", 123), (2, 2**300)):
+        assert helper_module.create_commitment(value, blinding) == helper_module.uncached_create_commitment(value, blinding)
+
+
+def _expected_commitment(helper_module, value, blinding):
+    p = helper_module.p
+    vexp = helper_module.value_to_exponent(value)
+    return (pow(helper_module.g, vexp, p) * pow(helper_module.h, blinding % (p - 1), p)) % p
+
+
+def test_pure_python_backend_matches_pow(helper_module, monkeypatch):
+    p = helper_module.p
+    for name in ("_G_LIMBS", "_powmod_sec", "_powmod", "_invert", "njit"):
+        monkeypatch.setattr(helper_module, name, None)
+
+    pairs = [(8, 4242), (2.5, 2**300), ("0", 0)] * 3
+    for value, blinding in pairs:
+        assert helper_module.uncached_create_commitment(value, blinding) == _expected_commitment(helper_module, value, blinding)
+    assert helper_module.create_commitments(*zip(*pairs)) == [_expected_commitment(helper_module, v, b) for v, b in pairs]
+    for base, exponent in ((helper_module.g, p - 2), (p + 7, 2**256 - 1), (3, 0)):
+        assert helper_module.mod_exp(base, exponent, p) == pow(base, exponent, p)
+    assert helper_module.div_mod_p(5, 7) == (5 * pow(7, -1, p)) % p
+
+
+def test_numba_kernels_match_pow(helper_module, monkeypatch):
+    pytest.importorskip("numba")
+    to_limbs, from_limbs = helper_module._to_limbs, helper_module._from_limbs
+    pairs = [(8, 4242), (2.5, 2**255 + 3), ("0", 0)]
+    vexps = [helper_module.value_to_exponent(v) for v, _ in pairs]
+    bexps = [helper_module._blinding_exponent(b) for _, b in pairs]
+    expected = [_expected_commitment(helper_module, v, b) for v, b in pairs]
+    g_limbs, h_limbs = helper_module._G_LIMBS, helper_module._H_LIMBS
+    assert [
+        from_limbs(helper_module.commit_u256(g_limbs, h_limbs, to_limbs(v), to_limbs(b)))
+        for v, b in zip(vexps, bexps)
+    ] == expected
+    rows = helper_module.commit_batch_u256(
+        g_limbs, h_limbs, helper_module._to_limb_rows(vexps), helper_module._to_limb_rows(bexps)
+    )
+    assert helper_module._from_limb_rows(rows) == expected
+
+    monkeypatch.setattr(helper_module, "_powmod_sec", None)
+    assert helper_module.create_commitments(*zip(*pairs * 3)) == expected * 3
+
+
+def test_gmpy2_backend_matches_pow(helper_module):
+    pytest.importorskip("gmpy2")
+    p = helper_module.p
+    vexp = helper_module.value_to_exponent(8)
+    assert int(helper_module._powmod_sec_p(helper_module._G_MPZ, vexp)) == pow(helper_module.g, vexp, p)
+    assert int(helper_module._powmod_sec_p(helper_module._H_MPZ, 2**255 + 3)) == pow(helper_module.h, 2**255 + 3, p)
+    assert helper_module.uncached_create_commitment(8, 4242) == _expected_commitment(helper_module, 8, 4242)
+    assert int(helper_module.mod_exp_mpz(helper_module._mpz(7), p - 2, p)) == pow(7, p - 2, p)
+    assert helper_module.div_mod_p(5, 7) == (5 * pow(7, -1, p)) % p
+
+
+def test_builders_skip_commitment_cache(helper_module):
+    helper_module._cached_commitment.cache_clear()
+    helper_module.build_mint(receiver_commitment=None, amount=1)
+    helper_module.build_mint(receiver_commitment=None, amount=1, amount_blinding=111)
+    helper_module.build_confidential_transfer_batch(1, [None, None], [1, 2])
+    helper_module.build_confidential_transfer_batch(1, [None, None], [1, 2], [5, None])
+    helper_module.build_confidential_approve(None, 3, 77)
+    assert helper_module._cached_commitment.cache_info().currsize == 0
+
+
+def test_mod_inverse_matches_fermat(helper_module):
+    p = helper_module.p
+    for x in (1, 2, 12345, p - 1, p + 5, helper_module.g, helper_module.h):
+        assert helper_module.mod_inverse(x) == pow(x % p, p - 2, p)
+    assert helper_module.mod_inverse(0) == 0
+
+
+def test_mod_inverse_generic_modulus(helper_module):
+    assert helper_module.mod_inverse(3, 10) == 7
+    assert helper_module.mod_inverse(0, 10) == 0
+    with pytest.raises(ValueError):
+        helper_module.mod_inverse(4, 10)
+
+
+def test_builders_return_reduced_amount_commitments(helper_module):
+    p = helper_module.p
+    plans = [
+        helper_module.build_mint(receiver_commitment=None, amount=3, amount_blinding=2**300),
+        helper_module.build_burn(from_commitment=7, amount=3, amount_blinding=2**300),
+        helper_module.build_confidential_transfer(7, None, 3, amount_blinding=2**300),
+    ]
+    for plan in plans:
+        assert 0 < plan["amount_commitment"] < p
+
+
+def test_create_commitments_matches_single(helper_module):
+    values = [1, 2.5, "7", 0] * 3
+    blindings = [11, 2**300, 0, helper_module.p - 2] * 3
+    assert helper_module.create_commitments(values, blindings) == [
+        helper_module.create_commitment(v, b) for v, b in zip(values, blindings)
+    ]
+    assert helper_module.create_commitments([], []) == []
+    with pytest.raises(ValueError):
+        helper_module.create_commitments([1], [])